@@ -1,19 +1,67 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Tuple
-
-import requests
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+
+import anyio
+import httpx
+import numpy as np
+from cachetools import LRUCache, TTLCache
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from numba import njit, vectorize
+from sgp4.api import SatrecArray, accelerated as SGP4_ACCELERATED
 from skyfield.api import EarthSatellite, load, wgs84
+from skyfield.sgp4lib import theta_GMST1982
+from skyfield.timelib import Time
 import math
 
 MU_EARTH = 398600.4418
 R_EARTH = 6378.137
 
+logger = logging.getLogger(__name__)
+
+# Every pass scan hands whole (jd, fr) arrays to sgp4; without the compiled extension
+# those calls fall back to a pure-Python loop over each time and satellite
+if not SGP4_ACCELERATED:
+    logger.warning(
+        "sgp4 C++ extension not available; propagation falls back to pure Python and "
+        "pass searches will be orders of magnitude slower. Reinstall sgp4 from a wheel."
+    )
+
 # ---------------------------
 # FastAPI setup + CORS (dev)
 # ---------------------------
-app = FastAPI(title="Satellite Tracker (SGP4/Skyfield)")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _http
+    _load_disk_tles()
+    # The client and the asyncio locks belong to this lifespan's event loop; a later
+    # lifespan of the same app (e.g. a second TestClient) gets fresh ones
+    _url_locks.clear()
+    _http = httpx.AsyncClient(timeout=15)
+    try:
+        yield
+    finally:
+        await _http.aclose()
+
+
+# orjson encodes floats/NumPy scalars natively; the numeric-heavy routes return an
+# ORJSONResponse directly so FastAPI also skips its per-value jsonable_encoder walk
+app = FastAPI(
+    title="Satellite Tracker (SGP4/Skyfield)",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,14 +81,295 @@ SATELLITES: Dict[str, Dict[str, object]] = {
     "noaa20": {"id": 43013, "tle_url": "https://celestrak.org/NORAD/elements/gp.php?GROUP=noaa&FORMAT=tle"},
 }
 
-eph = load("de421.bsp")
-earth, sun = eph["earth"], eph["sun"]
+# Cache: (norad_id, url) -> (EarthSatellite, last_refresh_utc, period_min); bounded, least recently used evicted
+SAT_CACHE_MAXSIZE = 128
+_sat_cache: LRUCache = LRUCache(maxsize=SAT_CACHE_MAXSIZE)
+
+# Cache: url -> ({norad_id: (L1, L2)}, last_refresh_utc); one parse serves every satellite in the list
+_tle_cache: Dict[str, Tuple[Dict[int, Tuple[str, str]], datetime]] = {}
+
+# One keep-alive async client for all TLE downloads (gzip is negotiated by default);
+# opened and closed by lifespan
+_http: httpx.AsyncClient
 
-# Cache: (norad_id, url) -> (EarthSatellite, last_refresh_utc)
-_sat_cache: Dict[Tuple[int, str], Tuple[EarthSatellite, datetime]] = {}
+# Per-URL locks so concurrent cache misses on the same list trigger a single download
+_url_locks: Dict[str, asyncio.Lock] = {}
+
+# CPU-bound propagation runs in worker threads, at most one per core
+_cpu_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+
+# "1 <catid>..." immediately followed by "2 <same catid>..."; a name line (3-line format) is skipped
+_TLE_PAIR_RE = re.compile(r"^(1 (.{5})[^\r\n]*)\r?\n(2 \2[^\r\n]*)", re.M)
 
 CACHE_MAX_AGE_HOURS = 6
 
+# Last good TLE per NORAD ID, persisted so a restart does not re-download every list:
+# norad_id -> (L1, L2, fetched_utc), mirrored to TLE_DISK_CACHE as {"norad": {"l1", "l2", "fetched"}}.
+# Lives next to this file unless TLE_CACHE_PATH points elsewhere (e.g. a mounted volume)
+TLE_DISK_CACHE = os.environ.get(
+    "TLE_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tle_cache.json")
+)
+DISK_CACHE_MAX_AGE_HOURS = 24
+_disk_tles: Dict[int, Tuple[str, str, datetime]] = {}
+
+# /now payloads are polled at ~1 Hz per client; a quarter-second TTL is invisible in the UI
+# but collapses duplicate propagations from several tabs/clients into one
+NOW_CACHE_TTL_S = 0.25
+_now_cache: TTLCache = TTLCache(maxsize=32, ttl=NOW_CACHE_TTL_S)
+
+# Pass search: coarse scan step, and how far below the horizon a coarse sample may be to open a
+# window. The gate ignores min_elev: near zenith a LEO pass climbs ~1 deg/s, so a high peak can
+# fall between two coarse samples that are tens of degrees lower, but never below the horizon.
+COARSE_STEP_S = 60
+COARSE_MARGIN_DEG = 5.0
+
+DAY_S = 86400.0
+
+
+@functools.lru_cache(maxsize=32)
+def _grid_offsets_s(count: int, step_s: float) -> np.ndarray:
+    """Static sample offsets (seconds) for a grid shape; read-only and shared by every request."""
+    offsets_s = np.arange(count, dtype=np.float64) * step_s
+    offsets_s.flags.writeable = False
+    return offsets_s
+
+
+def _times_at(t0_s: int, offsets_s: np.ndarray) -> Time:
+    """Vector Time at unix second t0_s plus the given offsets (seconds)."""
+    start = ts.from_datetime(datetime.fromtimestamp(t0_s, timezone.utc))
+    # TAI is uniform, so offsetting the TAI Julian date is exact for elapsed seconds
+    return ts.tai_jd(start.whole, start.tai_fraction + offsets_s / DAY_S)
+
+
+@functools.lru_cache(maxsize=16)
+def _frame_terms(t0_min: int, count: int, step_s: float):
+    """
+    Precession-nutation matrix and nutation angles for a grid starting on a minute boundary.
+    They drift by well under a milliarcsecond per minute, so every grid of this shape that
+    starts within the minute reuses them instead of re-running IAU 2000A.
+    """
+    tvec = _times_at(t0_min * 60, _grid_offsets_s(count, step_s))
+    return tvec.M, tvec._nutation_angles_radians
+
+
+@functools.lru_cache(maxsize=16)
+def _time_grid(t0_s: int, count: int, step_s: float) -> Tuple[Time, np.ndarray]:
+    """
+    Shared vector Time of 'count' samples every 'step_s' seconds from unix second t0_s,
+    plus the same instants as a datetime64[s] array (for _iso_utc).
+    Built from a Julian-date array (no per-sample datetimes) and cached, with the
+    sidereal time and precession/nutation matrices computed once so every request
+    and satellite using the same grid reuses them.
+    """
+    offsets_s = _grid_offsets_s(count, step_s)
+    tvec = _times_at(t0_s, offsets_s)
+    # Seed the cached (reify) attributes from this minute's frame terms. This relies on
+    # Skyfield keeping M and _nutation_angles_radians as plain writable instance fields
+    # (true for the pinned skyfield 1.55); recheck when upgrading
+    tvec.M, tvec._nutation_angles_radians = _frame_terms(t0_s // 60, count, step_s)
+    tvec.gast
+
+    iso = np.datetime64(t0_s, "s") + np.floor(offsets_s + 0.5).astype("timedelta64[s]")
+    return tvec, iso
+
+
+def _now_s() -> int:
+    """Current UTC time snapped to a 1-second bucket (the _time_grid cache key)."""
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+def _iso_utc(iso: np.ndarray) -> List[str]:
+    """datetime64[s] array -> 'YYYY-MM-DDTHH:MM:SSZ' strings in one vectorized call."""
+    return np.datetime_as_string(iso, unit="s", timezone="UTC").tolist()
+
+
+def _subpoints(sat: EarthSatellite, tvec: Time, iso: np.ndarray) -> Dict[str, List]:
+    """
+    Propagate over a vector Time (one Skyfield call) and return columnar
+    time_utc/lat/lon/alt_km lists straight from the NumPy arrays.
+    """
+    geo = sat.at(tvec)
+    sp = wgs84.subpoint(geo)
+    return {
+        "time_utc": _iso_utc(iso),
+        "lat": sp.latitude.degrees.tolist(),
+        "lon": sp.longitude.degrees.tolist(),
+        "alt_km": sp.elevation.km.tolist(),
+    }
+
+
+def _sun_ra_dec(tvec: Time) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Low-precision solar right ascension and declination (radians, equinox of date),
+    good to ~0.01 deg (Astronomical Almanac formula) - plenty for twilight/shadow tests.
+    """
+    n = tvec.tt - 2451545.0
+    L = np.radians(280.460 + 0.9856474 * n)
+    g = np.radians(357.528 + 0.9856003 * n)
+    lam = L + np.radians(1.915) * np.sin(g) + np.radians(0.020) * np.sin(2 * g)
+    eps = np.radians(23.439 - 0.0000004 * n)
+    ra = np.arctan2(np.cos(eps) * np.sin(lam), np.cos(lam))
+    dec = np.arcsin(np.sin(eps) * np.sin(lam))
+    return ra, dec
+
+
+def _sun_altitude_deg(tvec: Time, lat: float, lon: float) -> np.ndarray:
+    """Geometric Sun altitude (deg) at the observer from its hour angle (no apparent-place chain)."""
+    ra, dec = _sun_ra_dec(tvec)
+    lat_r = math.radians(lat)
+    hour_angle = np.radians(tvec.gast * 15.0 + lon) - ra
+    return np.degrees(np.arcsin(
+        math.sin(lat_r) * np.sin(dec) + math.cos(lat_r) * np.cos(dec) * np.cos(hour_angle)
+    ))
+
+
+def _sun_direction(tvec: Time) -> np.ndarray:
+    """Unit vectors toward the Sun (equinox of date, ~TEME), shape (N, 3)."""
+    ra, dec = _sun_ra_dec(tvec)
+    return np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def _is_sunlit(r_km: np.ndarray, sun_hat: np.ndarray) -> np.ndarray:
+    """
+    Cylindrical Earth-shadow test: a satellite is lit unless it is on the night side
+    and within R_EARTH of the Earth-Sun axis. r_km is (..., N, 3), sun_hat is (N, 3).
+    """
+    along = np.sum(r_km * sun_hat, axis=-1)
+    perp = np.linalg.norm(r_km - along[..., None] * sun_hat, axis=-1)
+    return (along > 0.0) | (perp > R_EARTH)
+
+
+def _ground_track(sat: EarthSatellite, minutes: int, step_s: int) -> Dict[str, List]:
+    """Ground track for the next N minutes sampled every step_s seconds."""
+    tvec, iso = _time_grid(_now_s(), minutes * 60 // step_s + 1, step_s)
+    return _subpoints(sat, tvec, iso)
+
+
+@dataclass
+class Passes:
+    """
+    Pass segments kept as parallel arrays (sample indices into 'iso') until the
+    response is built, instead of one dict per pass.
+    """
+    iso: np.ndarray           # datetime64[s] time of every sample
+    aos_idx: np.ndarray
+    tca_idx: np.ndarray
+    los_idx: np.ndarray
+    max_elev_deg: np.ndarray
+    visible: np.ndarray
+    step_s: int
+
+    @classmethod
+    def empty(cls, iso: np.ndarray, step_s: int) -> "Passes":
+        none = np.empty(0, dtype=np.intp)
+        return cls(iso, none, none, none, np.empty(0), np.empty(0, dtype=bool), step_s)
+
+    def __len__(self) -> int:
+        return self.aos_idx.size
+
+    def to_list(self) -> List[Dict]:
+        """JSON-ready pass dicts (AOS/TCA/LOS in ISO UTC)."""
+        duration_s = (self.los_idx - self.aos_idx) * self.step_s
+        aos, tca, los = (_iso_utc(self.iso[i]) for i in (self.aos_idx, self.tca_idx, self.los_idx))
+        return [
+            {
+                "aos_utc": a,
+                "tca_utc": t,
+                "los_utc": l,
+                "max_elev_deg": elev,
+                "duration_s": dur,
+                "visible": vis,
+            }
+            for a, t, l, elev, dur, vis in zip(aos, tca, los, self.max_elev_deg, duration_s, self.visible)
+        ]
+
+
+def _sgp4_jd(tvec: Time) -> Tuple[np.ndarray, np.ndarray]:
+    """Same UTC Julian date split Skyfield feeds SGP4."""
+    return tvec.whole, tvec.tai_fraction - tvec._leap_seconds() / DAY_S
+
+
+def _teme_to_itrf(tvec: Time, r_teme: np.ndarray) -> np.ndarray:
+    """
+    TEME -> ITRF for (..., N, 3) positions: a z-rotation by GMST (same rotation as
+    skyfield's TEME_to_ITRF, without polar motion), one angle per time.
+    """
+    theta, _theta_dot = theta_GMST1982(tvec.whole, tvec.ut1_fraction)
+    c, s = np.cos(theta), np.sin(theta)
+    x, y, z = r_teme[..., 0], r_teme[..., 1], r_teme[..., 2]
+    return np.stack([c * x + s * y, -s * x + c * y, z], axis=-1)
+
+
+@functools.lru_cache(maxsize=64)
+def _observer_frame(lat: float, lon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Observer ITRF position (km) and its local east/north/up unit vectors (rows of a 3x3).
+    Both are static in ITRF, so they are built once per site and reused for every time step.
+    """
+    lat_r, lon_r = math.radians(lat), math.radians(lon)
+    p = wgs84.latlon(latitude_degrees=lat, longitude_degrees=lon).itrs_xyz.km
+    enu = np.array([
+        [-math.sin(lon_r), math.cos(lon_r), 0.0],
+        [-math.sin(lat_r) * math.cos(lon_r), -math.sin(lat_r) * math.sin(lon_r), math.cos(lat_r)],
+        [math.cos(lat_r) * math.cos(lon_r), math.cos(lat_r) * math.sin(lon_r), math.sin(lat_r)],
+    ])
+    p.flags.writeable = False
+    enu.flags.writeable = False
+    return p, enu
+
+
+@vectorize(["float64(" + ", ".join(["float64"] * 15) + ")"], target="parallel", cache=True)
+def _elevation_kernel(rx, ry, rz, px, py, pz, ex, ey, ez, nx, ny, nz, ux, uy, uz):
+    """Subtract, rotate into east/north/up and take the elevation in one fused pass per sample."""
+    dx = rx - px
+    dy = ry - py
+    dz = rz - pz
+    east = dx * ex + dy * ey + dz * ez
+    north = dx * nx + dy * ny + dz * nz
+    up = dx * ux + dy * uy + dz * uz
+    return math.degrees(math.atan2(up, math.sqrt(east * east + north * north)))
+
+
+# The parallel ufunc already spreads over every core; numba's fallback (workqueue)
+# threading layer also aborts if two worker threads launch it at once
+_elevation_lock = threading.Lock()
+
+
+def _elevations_deg(r_itrf: np.ndarray, p: np.ndarray, enu: np.ndarray) -> np.ndarray:
+    """Topocentric elevation (deg) of ITRF positions (..., 3) seen from p with local axes enu."""
+    with _elevation_lock:
+        return _elevation_kernel(r_itrf[..., 0], r_itrf[..., 1], r_itrf[..., 2], *p, *enu.ravel())
+
+
+def _topocentric_elevations(sats: List[EarthSatellite], tvec: Time, p: np.ndarray, enu: np.ndarray):
+    """
+    Elevation (deg, (Nsat, N)) of several satellites over a vector Time straight from raw SGP4
+    output, skipping Skyfield's ITRF -> GCRS -> altaz frames; also returns the TEME positions.
+    SGP4 runs once in C for all satellites x all times (SatrecArray).
+    """
+    jd, fr = _sgp4_jd(tvec)
+    _err, r_teme, _v_teme = SatrecArray([s.model for s in sats]).sgp4(jd, fr)  # (Nsat, N, 3) km
+    return _elevations_deg(_teme_to_itrf(tvec, r_teme), p, enu), r_teme
+
+
+def _fine_windows(candidate: np.ndarray, step_s: int, n_fine: int) -> np.ndarray:
+    """
+    Fine-grid sample indices covering each run of coarse candidates, widened by one
+    coarse step on both sides; overlapping windows merge.
+    """
+    padded = np.r_[False, candidate, False]
+    starts = np.flatnonzero(~padded[:-1] & padded[1:])
+    ends = np.flatnonzero(padded[:-1] & ~padded[1:]) - 1  # inclusive
+    lo = np.maximum((starts - 1) * COARSE_STEP_S // step_s, 0)
+    hi = np.minimum(-(-(ends + 1) * COARSE_STEP_S // step_s), n_fine - 1)
+
+    # +1/-1 marks at window bounds; a running sum > 0 means "inside some window"
+    marks = np.zeros(n_fine + 1, dtype=np.int32)
+    np.add.at(marks, lo, 1)
+    np.add.at(marks, hi + 1, -1)
+    return np.flatnonzero(np.cumsum(marks[:-1]) > 0)
+
+
 def _passes_for_observer(
     sat: EarthSatellite,
     lat: float,
@@ -49,114 +378,243 @@ def _passes_for_observer(
     step_s: int = 10,
     min_elev_deg: float = 10.0,
     visible_only: bool = False,
-) -> List[Dict]:
-    """Vectorized scan for AOS/TCA/LOS segments."""
-    t0 = datetime.now(timezone.utc)
-    # Build a vector Time object instead of many scalar times
-    dts = [t0 + timedelta(seconds=i) for i in range(0, hours * 3600 + 1, step_s)]
-    tvec = ts.from_datetimes(dts)
-
-    observer = wgs84.latlon(latitude_degrees=lat, longitude_degrees=lon)
-
-    # Vectorized topocentric alt/az over all times
-    topo = (sat - observer).at(tvec)
-    alt, az, _rng = topo.altaz()
-    elevs = alt.degrees  # numpy array
-
-    # Vectorized Sun altitude at the observer
-    sun_alt = (earth + observer).at(tvec).observe(sun).apparent().altaz()[0].degrees
-
-    # Vectorized sunlight flag for the satellite
-    lit = sat.at(tvec).is_sunlit(eph)  # numpy bool array
-
-    # Pass segments where elevation >= threshold
-    above = elevs >= min_elev_deg
-    passes: List[Dict] = []
+) -> Passes:
+    """Vectorized scan for AOS/TCA/LOS segments of one satellite (see _batch_passes)."""
+    return _batch_passes([sat], lat, lon, hours, step_s, min_elev_deg, visible_only)[0]
+
+
+@njit(cache=True)
+def _segment_summary_kernel(elevs, sun_alt, lit, starts, ends):
+    """Per [start, end] run: first argmax of elevs, its value, max sun_alt and any(lit)."""
+    n = starts.size
+    peaks = np.empty(n, dtype=np.int64)
+    peak_elev = np.empty(n, dtype=np.float64)
+    sun_max = np.empty(n, dtype=np.float64)
+    lit_any = np.zeros(n, dtype=np.bool_)
+    for k in range(n):
+        s = starts[k]
+        best = s
+        smax = sun_alt[s]
+        for i in range(s, ends[k] + 1):
+            if elevs[i] > elevs[best]:
+                best = i
+            if sun_alt[i] > smax:
+                smax = sun_alt[i]
+            if lit[i]:
+                lit_any[k] = True
+        peaks[k] = best
+        peak_elev[k] = elevs[best]
+        sun_max[k] = smax
+    return peaks, peak_elev, sun_max, lit_any
+
+
+def _build_passes(
+    iso: np.ndarray,
+    elevs: np.ndarray,
+    above: np.ndarray,
+    sun_alt: np.ndarray,
+    lit: np.ndarray,
+    step_s: int,
+    visible_only: bool,
+) -> Passes:
+    """Turn per-sample elevation/sun/sunlit arrays into AOS/TCA/LOS pass segments."""
     if not above.any():
-        return passes
+        return Passes.empty(iso, step_s)
 
     # Find start/end indices of True runs in 'above'
     # transitions: False->True (start), True->False (end)
-    import numpy as np
-
-    idx = np.arange(above.size)
     # pad with False at both ends to catch edges cleanly
     padded = np.r_[False, above, False]
     starts = np.where(~padded[:-1] & padded[1:])[0]
     ends   = np.where(padded[:-1] & ~padded[1:])[0] - 1  # inclusive
 
-    for s, e in zip(starts, ends):
-        # Visible criteria: darkest sun altitude during the segment < -6 and lit at any point
-        visible = (sun_alt[s:e+1].max() < -6.0) and (lit[s:e+1].any())
-        if visible_only and not visible:
-            continue
-
-        seg_elevs = elevs[s:e+1]
-        peak_rel = int(np.argmax(seg_elevs))
-        peak = s + peak_rel
-
-        passes.append({
-            "aos_utc": tvec[s].utc_iso(),
-            "tca_utc": tvec[peak].utc_iso(),
-            "los_utc": tvec[e].utc_iso(),
-            "max_elev_deg": float(elevs[peak]),
-            "duration_s": int((e - s) * step_s),
-            "visible": bool(visible),
-        })
+    # Per-segment peak, darkest sun altitude and sunlit flag in one compiled pass
+    peaks, peak_elev, sun_max, lit_any = _segment_summary_kernel(elevs, sun_alt, lit, starts, ends)
+    # Visible criteria: darkest sun altitude during the segment < -6 and lit at any point
+    visible = (sun_max < -6.0) & lit_any
+
+    keep = visible if visible_only else slice(None)
+    return Passes(
+        iso=iso,
+        aos_idx=starts[keep],
+        tca_idx=peaks[keep],
+        los_idx=ends[keep],
+        max_elev_deg=peak_elev[keep],
+        visible=visible[keep],
+        step_s=step_s,
+    )
+
+
+def _batch_passes(
+    sats: List[EarthSatellite],
+    lat: float,
+    lon: float,
+    hours: int = 24,
+    step_s: int = 10,
+    min_elev_deg: float = 10.0,
+    visible_only: bool = False,
+) -> List[Passes]:
+    """
+    Pass scan for several satellites over one observer, in two stages: a coarse scan every
+    COARSE_STEP_S finds candidate windows for any satellite, then only those windows are
+    propagated at step_s instead of the whole hours * 3600 / step_s grid. Both stages run
+    SGP4 for all satellites at once and share one set of Sun terms.
+    """
+    t0_s = _now_s()
+    n_fine = hours * 3600 // step_s + 1
+    p, enu = _observer_frame(lat, lon)
+
+    # Stage 1: coarse scan on the shared cached grid (nutation terms already warm)
+    coarse, _iso_c = _time_grid(t0_s, hours * 3600 // COARSE_STEP_S + 1, COARSE_STEP_S)
+    coarse_elevs, _r_c = _topocentric_elevations(sats, coarse, p, enu)
+    candidate = (coarse_elevs >= min(min_elev_deg, 0.0) - COARSE_MARGIN_DEG).any(axis=0)
+    idx = _fine_windows(candidate, step_s, n_fine)
+    if idx.size == 0:
+        return [Passes.empty(np.empty(0, dtype="datetime64[s]"), step_s) for _ in sats]
+
+    # Stage 2: fine samples inside the windows only. Nutation (for the Sun's hour angle)
+    # barely moves in half a coarse step, so borrow it from the nearest coarse sample.
+    offsets_s = (idx * step_s).astype(np.float64)
+    tvec = _times_at(t0_s, offsets_s)
+    near = np.minimum(np.rint(offsets_s / COARSE_STEP_S).astype(np.intp), len(coarse) - 1)
+    tvec._nutation_angles_radians = tuple(a[near] for a in coarse._nutation_angles_radians)
+    iso = np.datetime64(t0_s, "s") + (idx * step_s).astype("timedelta64[s]")
+
+    # Vectorized topocentric elevation, (Nsat, Ntime) (TEME vectors kept for the shadow test)
+    elevs, r_teme = _topocentric_elevations(sats, tvec, p, enu)
+
+    # Pass segments where elevation >= threshold. Every window edge sits on a coarse sample
+    # below the margin for all satellites (or the span's ends), so no run spans a window gap.
+    above = elevs >= min_elev_deg
+    if not above.any():
+        return [Passes.empty(iso, step_s) for _ in sats]
+
+    # Vectorized Sun altitude at the observer
+    sun_alt = _sun_altitude_deg(tvec, lat, lon)
 
-    return passes
+    # Shadow test in TEME (of-date equator/equinox, like the Sun direction) for all satellites
+    lit = _is_sunlit(r_teme, _sun_direction(tvec))
 
-def _find_tle_by_norad(norad_id: int, text: str) -> Tuple[str, str]:
+    return [
+        _build_passes(iso, sat_elevs, sat_above, sun_alt, sat_lit, step_s, visible_only)
+        for sat_elevs, sat_above, sat_lit in zip(elevs, above, lit)
+    ]
+
+
+def _parse_tle_catalog(text: str) -> Dict[int, Tuple[str, str]]:
     """
-    Search a Celestrak-style text list for the given NORAD ID and return (L1, L2).
+    Index a Celestrak-style text list as {norad_id: (L1, L2)} in a single regex pass.
     Works whether the file is 3-line format (name\nL1\nL2) or line-paired (L1\nL2 repeated).
     """
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    # We look for any "1 <catid>" line; the next line must be "2 ..."
-    target = str(norad_id)
-    for i, ln in enumerate(lines):
-        if ln.startswith("1 "):
-            parts = ln.split()
-            if len(parts) >= 2 and parts[1].startswith(target):
-                if i + 1 < len(lines) and lines[i + 1].startswith("2 "):
-                    return ln, lines[i + 1]
-    # Fallback: handle 3-line blocks where name precedes L1/L2
-    for i, ln in enumerate(lines):
-        if ln.upper().startswith("ISS") or ln.upper().startswith("CSS") or ln.upper().startswith("HUBBLE"):
-            # try to read subsequent L1/L2
-            if i + 2 < len(lines) and lines[i + 1].startswith("1 ") and lines[i + 2].startswith("2 "):
-                parts = lines[i + 1].split()
-                if len(parts) >= 2 and parts[1].startswith(target):
-                    return lines[i + 1], lines[i + 2]
-    raise ValueError(f"NORAD {norad_id} not found in TLE list.")
-
-
-def fetch_satellite(norad_id: int, tle_url: str) -> EarthSatellite:
+    catalog: Dict[int, Tuple[str, str]] = {}
+    for m in _TLE_PAIR_RE.finditer(text):
+        try:
+            catalog[int(m.group(2))] = (m.group(1).strip(), m.group(3).strip())
+        except ValueError:
+            continue  # Alpha-5 catalog numbers aren't in the registry
+    return catalog
+
+
+async def _run_cpu(func, *args, **kwargs):
+    """Run numeric work off the event loop so TLE downloads and other requests overlap it."""
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_cpu_limiter)
+
+
+def _cache_satellite(
+    key: Tuple[int, str], l1: str, l2: str, refreshed: datetime
+) -> Tuple[EarthSatellite, float]:
+    """Build the EarthSatellite and cache it with its orbital period (fixed for the TLE's life)."""
+    sat = EarthSatellite(l1, l2, f"SAT-{key[0]}", ts)
+    period_min = 2 * math.pi / (sat.model.no_kozai / 60.0) / 60.0
+    _sat_cache[key] = (sat, refreshed, period_min)
+    return sat, period_min
+
+
+def _load_disk_tles() -> None:
+    """Seed _disk_tles from TLE_DISK_CACHE; a missing or unreadable file just means a cold start."""
+    try:
+        with open(TLE_DISK_CACHE, encoding="utf-8") as f:
+            raw = json.load(f)
+        _disk_tles.update({
+            int(norad): (entry["l1"], entry["l2"], datetime.fromisoformat(entry["fetched"]))
+            for norad, entry in raw.items()
+        })
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+
+def _save_disk_tle(norad_id: int, l1: str, l2: str, fetched: datetime) -> None:
+    """Record a freshly fetched TLE and rewrite TLE_DISK_CACHE atomically (temp file + rename)."""
+    if _disk_tles.get(norad_id) == (l1, l2, fetched):
+        return
+    _disk_tles[norad_id] = (l1, l2, fetched)
+    data = {
+        str(norad): {"l1": a, "l2": b, "fetched": when.isoformat()}
+        for norad, (a, b, when) in _disk_tles.items()
+    }
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(TLE_DISK_CACHE)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, TLE_DISK_CACHE)
+    except OSError:
+        # Persistence is best-effort; a read-only filesystem only costs the warm restart
+        pass
+
+
+async def fetch_satellite(norad_id: int, tle_url: str) -> EarthSatellite:
     """
     Get a fresh (or cached) EarthSatellite for the given NORAD ID from the given URL.
     Caches for CACHE_MAX_AGE_HOURS to avoid re-downloading every request.
     """
+    sat, _period_min = await fetch_satellite_with_period(norad_id, tle_url)
+    return sat
+
+
+async def fetch_satellite_with_period(norad_id: int, tle_url: str) -> Tuple[EarthSatellite, float]:
+    """fetch_satellite, also returning the orbital period (min) cached alongside the TLE."""
     key = (norad_id, tle_url)
     now = datetime.now(timezone.utc)
 
     sat_cached = _sat_cache.get(key)
     if sat_cached:
-        sat, last_refresh = sat_cached
+        sat, last_refresh, period_min = sat_cached
         if now - last_refresh < timedelta(hours=CACHE_MAX_AGE_HOURS):
-            return sat
-
-    try:
-        resp = requests.get(tle_url, timeout=15)
-        resp.raise_for_status()
-        l1, l2 = _find_tle_by_norad(norad_id, resp.text)
-        sat = EarthSatellite(l1, l2, f"SAT-{norad_id}", ts)
-        _sat_cache[key] = (sat, now)
-        return sat
-    except Exception as e:
-        # If we have a stale cache, fall back to it instead of total failure
-        if sat_cached:
-            return sat_cached[0]
-        raise HTTPException(status_code=502, detail=f"Failed to fetch TLE for {norad_id}: {e}")
+            return sat, period_min
+
+    # Only one caller per list downloads; the others wait here and reuse its result
+    async with _url_locks.setdefault(tle_url, asyncio.Lock()):
+        # Another request (or satellite from the same list) may already have refreshed it
+        tle_cached = _tle_cache.get(tle_url)
+        if tle_cached and norad_id in tle_cached[0]:
+            catalog, last_refresh = tle_cached
+            if now - last_refresh < timedelta(hours=CACHE_MAX_AGE_HOURS):
+                l1, l2 = catalog[norad_id]
+                _save_disk_tle(norad_id, l1, l2, last_refresh)
+                return _cache_satellite(key, l1, l2, last_refresh)
+
+        # Cold start: a TLE persisted by a previous run beats a network round-trip
+        disk_cached = _disk_tles.get(norad_id)
+        if not sat_cached and disk_cached and now - disk_cached[2] < timedelta(hours=DISK_CACHE_MAX_AGE_HOURS):
+            return _cache_satellite(key, *disk_cached)
+
+        try:
+            resp = await _http.get(tle_url)
+            resp.raise_for_status()
+            catalog = _parse_tle_catalog(resp.text)
+            _tle_cache[tle_url] = (catalog, now)
+            if norad_id not in catalog:
+                raise ValueError(f"NORAD {norad_id} not found in TLE list.")
+            l1, l2 = catalog[norad_id]
+            _save_disk_tle(norad_id, l1, l2, now)
+            return _cache_satellite(key, l1, l2, now)
+        except Exception as e:
+            # If we have a stale cache, fall back to it instead of total failure
+            if sat_cached:
+                return sat_cached[0], sat_cached[2]
+            if disk_cached:
+                return _cache_satellite(key, *disk_cached)
+            raise HTTPException(status_code=502, detail=f"Failed to fetch TLE for {norad_id}: {e}")
 
 
 def _now_payload(sat: EarthSatellite, name: str, norad_id: int) -> dict:
@@ -183,6 +641,16 @@ def _now_payload(sat: EarthSatellite, name: str, norad_id: int) -> dict:
         },
     }
 
+
+async def _cached_now_payload(key: str) -> dict:
+    """_now_payload for a registry satellite, memoized for NOW_CACHE_TTL_S."""
+    payload = _now_cache.get(key)
+    if payload is None:
+        info = SATELLITES[key]
+        sat = await fetch_satellite(info["id"], info["tle_url"])
+        payload = _now_cache[key] = _now_payload(sat, key, info["id"])
+    return payload
+
 def get_tle_elements(sat):
     inclo = sat.model.inclo      # inclination [rad]
     raan = sat.model.nodeo       # RAAN [rad]
@@ -233,12 +701,12 @@ def get_tle_elements(sat):
 # ---------------------------
 
 @app.get("/api/satellite/{name}/elements")
-def satellite_elements(name: str):
+async def satellite_elements(name: str):
     key = name.lower()
     if key not in SATELLITES:
         raise HTTPException(status_code=404, detail=f"Satellite '{name}' not supported.")
     info = SATELLITES[key]
-    sat = fetch_satellite(info["id"], info["tle_url"])
+    sat = await fetch_satellite(info["id"], info["tle_url"])
     elems = get_tle_elements(sat)
     epoch_iso = sat.epoch.utc_strftime("%Y-%m-%dT%H:%M:%SZ")
     return {
@@ -251,12 +719,12 @@ def satellite_elements(name: str):
 
 
 @app.get("/api/ping")
-def ping():
+async def ping():
     return {"ok": True}
 
 
 @app.get("/api/satellite/{name}/now")
-def satellite_now(name: str):
+async def satellite_now(name: str):
     """
     Dynamic satellite endpoint.
     Supported names (by default): iss, css, hubble, noaa20, starlink
@@ -264,72 +732,38 @@ def satellite_now(name: str):
     key = name.lower()
     if key not in SATELLITES:
         raise HTTPException(status_code=404, detail=f"Satellite '{name}' not supported.")
-    info = SATELLITES[key]
-    sat = fetch_satellite(info["id"], info["tle_url"])
-    return _now_payload(sat, key, info["id"])
+    return await _cached_now_payload(key)
 
 
 # --- Compatibility alias: /now returns ISS (ZARYA) ---
 @app.get("/api/now")
-def now_iss():
-    info = SATELLITES["iss"]
-    sat = fetch_satellite(info["id"], info["tle_url"])
-    return _now_payload(sat, "iss", info["id"])
+async def now_iss():
+    return await _cached_now_payload("iss")
 
 
 # --- Simple ISS ground track, useful for the basic map ---
 @app.get("/api/track")
-def track(minutes: int = 90, step_s: int = 30):
+async def track(minutes: int = 90, step_s: int = 30):
     """
     Ground track for ISS for the next N minutes (default 90) sampled every step_s seconds.
     """
     info = SATELLITES["iss"]
-    sat = fetch_satellite(info["id"], info["tle_url"])
-
-    t0 = datetime.now(timezone.utc)
-    times = [ts.from_datetime(t0 + timedelta(seconds=i)) for i in range(0, minutes * 60 + 1, step_s)]
+    sat = await fetch_satellite(info["id"], info["tle_url"])
 
-    points = []
-    for tt in times:
-        geo = sat.at(tt)
-        sp = wgs84.subpoint(geo)
-        points.append(
-            {
-                "time_utc": tt.utc_iso(),
-                "lat": sp.latitude.degrees,
-                "lon": sp.longitude.degrees,
-                "alt_km": sp.elevation.km,
-            }
-        )
-    return {"points": points}
+    return ORJSONResponse({"points": await _run_cpu(_ground_track, sat, minutes, step_s)})
 
 @app.get("/api/satellite/{name}/track")
-def satellite_track(name: str, minutes: int = 90, step_s: int = 30):
+async def satellite_track(name: str, minutes: int = 90, step_s: int = 30):
     key = name.lower()
     if key not in SATELLITES:
         raise HTTPException(status_code=404, detail=f"Satellite '{name}' not supported.")
     info = SATELLITES[key]
-    sat = fetch_satellite(info["id"], info["tle_url"])
+    sat = await fetch_satellite(info["id"], info["tle_url"])
 
-    t0 = datetime.now(timezone.utc)
-    times = [ts.from_datetime(t0 + timedelta(seconds=i)) for i in range(0, minutes * 60 + 1, step_s)]
-
-    points = []
-    for tt in times:
-        geo = sat.at(tt)
-        sp = wgs84.subpoint(geo)
-        points.append(
-            {
-                "time_utc": tt.utc_iso(),
-                "lat": sp.latitude.degrees,
-                "lon": sp.longitude.degrees,
-                "alt_km": sp.elevation.km,
-            }
-        )
-    return {"points": points}
+    return ORJSONResponse({"points": await _run_cpu(_ground_track, sat, minutes, step_s)})
 
 @app.get("/api/satellite/{name}/passes")
-def satellite_passes(
+async def satellite_passes(
     name: str,
     lat: float = Query(..., description="Observer latitude (deg)"),
     lon: float = Query(..., description="Observer longitude (deg)"),
@@ -342,9 +776,10 @@ def satellite_passes(
     if key not in SATELLITES:
         raise HTTPException(status_code=404, detail=f"Satellite '{name}' not supported.")
     info = SATELLITES[key]
-    sat = fetch_satellite(info["id"], info["tle_url"])
+    sat = await fetch_satellite(info["id"], info["tle_url"])
 
-    passes = _passes_for_observer(
+    passes = await _run_cpu(
+        _passes_for_observer,
         sat=sat,
         lat=lat,
         lon=lon,
@@ -353,7 +788,7 @@ def satellite_passes(
         min_elev_deg=min_elev_deg,
         visible_only=visible_only,
     )
-    return {
+    return ORJSONResponse({
         "satellite": key,
         "norad_id": info["id"],
         "params": {
@@ -362,41 +797,58 @@ def satellite_passes(
             "visible_only": visible_only,
         },
         "count": len(passes),
-        "passes": passes,
-    }
+        "passes": passes.to_list(),
+    })
+
+
+@app.get("/api/passes")
+async def passes_all(
+    lat: float = Query(..., description="Observer latitude (deg)"),
+    lon: float = Query(..., description="Observer longitude (deg)"),
+    names: str = Query("", description="Comma-separated satellite names (default: all)"),
+    hours: int = Query(24, ge=1, le=72),
+    step_s: int = Query(10, ge=1, le=60),
+    min_elev_deg: float = Query(10.0, ge=0.0, le=90.0),
+    visible_only: bool = Query(False),
+):
+    """
+    Passes for several satellites over one observer, propagated together on shared time grids.
+    """
+    keys = [n.strip().lower() for n in names.split(",") if n.strip()] or list(SATELLITES)
+    for key in keys:
+        if key not in SATELLITES:
+            raise HTTPException(status_code=404, detail=f"Satellite '{key}' not supported.")
+    sats = await asyncio.gather(*(fetch_satellite(SATELLITES[k]["id"], SATELLITES[k]["tle_url"]) for k in keys))
+
+    all_passes = await _run_cpu(_batch_passes, sats, lat, lon, hours, step_s, min_elev_deg, visible_only)
+    return ORJSONResponse({
+        "params": {
+            "lat": lat, "lon": lon, "hours": hours,
+            "step_s": step_s, "min_elev_deg": min_elev_deg,
+            "visible_only": visible_only,
+        },
+        "satellites": {
+            key: {"norad_id": SATELLITES[key]["id"], "count": len(passes), "passes": passes.to_list()}
+            for key, passes in zip(keys, all_passes)
+        },
+    })
 
 
 # --- 3D orbital path (variable altitude) ------------------------
-def _orbit_path_points(sat: EarthSatellite, steps: int = 240, periods: float = 1.0):
+def _orbit_path_points(sat: EarthSatellite, period_min: float, steps: int = 240, periods: float = 1.0):
     """
     Sample the satellite's position for 'periods' orbital periods into the future,
-    returning points with lat, lon, and altitude (km). Use this for a 3D orbit path.
-    """
-    # Use your existing element math to get period (min)
-    elems = get_tle_elements(sat)  # already defined in your file
-    period_min = elems["period_min"] if elems and "period_min" in elems else 90.0
-    period_s = period_min * 60.0
-    total_s = max(steps - 1, 1) * (period_s * periods) / max(steps - 1, 1)
-
-    t0 = datetime.now(timezone.utc)
-    # Build equally spaced times across the requested span
-    times = [ts.from_datetime(t0 + timedelta(seconds=i * total_s / (steps - 1)))
-             for i in range(steps)]
-
-    pts = []
-    for tt in times:
-        geo = sat.at(tt)
-        sp = wgs84.subpoint(geo)  # gives the nadir lat/lon and the satellite altitude above ellipsoid
-        pts.append({
-            "time_utc": tt.utc_iso(),
-            "lat": sp.latitude.degrees,
-            "lon": sp.longitude.degrees,
-            "alt_km": sp.elevation.km,  # altitude above WGS-84 ellipsoid
-        })
-    return pts
+    returning columnar time/lat/lon/altitude (km) arrays. Use this for a 3D orbit path.
+    """
+    total_s = period_min * 60.0 * periods
+
+    # Equally spaced times across the requested span; the subpoint gives the nadir
+    # lat/lon and the satellite altitude above the WGS-84 ellipsoid
+    tvec, iso = _time_grid(_now_s(), steps, total_s / max(steps - 1, 1))
+    return _subpoints(sat, tvec, iso)
 
 @app.get("/api/satellite/{name}/orbit_path")
-def satellite_orbit_path(
+async def satellite_orbit_path(
     name: str,
     steps: int = 240,
     periods: float = 1.0
@@ -409,13 +861,13 @@ def satellite_orbit_path(
     if key not in SATELLITES:
         raise HTTPException(status_code=404, detail=f"Satellite '{name}' not supported.")
     info = SATELLITES[key]
-    sat = fetch_satellite(info["id"], info["tle_url"])
+    sat, period_min = await fetch_satellite_with_period(info["id"], info["tle_url"])
 
-    points = _orbit_path_points(sat, steps=steps, periods=periods)
-    return {
+    points = await _run_cpu(_orbit_path_points, sat, period_min, steps=steps, periods=periods)
+    return ORJSONResponse({
         "satellite": key,
         "norad_id": info["id"],
         "steps": steps,
         "periods": periods,
         "points": points
-    }
+    })
@@ -4,6 +4,7 @@ import Orbit3D from "./Orbit3D";
 import SatelliteCard from "./SatCard";
 import OrbitalElementsCard from "./OrbitalElementsCard";
 import Globe3D from "./Globe3D";
+import { trackRows, type TrackColumns, type TrackPoint } from "../lib/api";
 const API_BASE = import.meta.env.VITE_API_BASE;
 
 type SatelliteData = {
@@ -21,13 +22,6 @@ type PassInfo = {
   visible: boolean;
 };
 
-type TrackPoint = {
-  time_utc: string;
-  lat: number;
-  lon: number;
-  alt_km: number;
-};
-
 const SATELLITES = [
   { code: "iss", shortName: "ISS", description: "International Space Station" },
   { code: "css", shortName: "CSS", description: "Chinese Space Station" },
@@ -109,8 +103,8 @@ export default function FrontPage() {
       }
 
       if (rTrack.ok) {
-        const jTrack = (await rTrack.json()) as { points: TrackPoint[] };
-        setTrack(jTrack.points);
+        const jTrack = (await rTrack.json()) as { points: TrackColumns };
+        setTrack(trackRows(jTrack.points));
       } else {
         setTrack([]);
       }
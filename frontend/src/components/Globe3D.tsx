@@ -1,5 +1,6 @@
 import Globe from "react-globe.gl";
 import {useEffect, useRef, useState} from "react";
+import { trackRows } from "../lib/api";
 
 const EARTH_RADIUS_KM = 6371;
 const API_BASE = import.meta.env.VITE_API_BASE as string;
@@ -36,7 +37,7 @@ export default function Globe3D({
           { signal: controller.signal }
         );
         const data = await r.json();
-        setOrbitPath(Array.isArray(data.points) ? data.points : []);
+        setOrbitPath(trackRows(data.points));
       } catch {
         setOrbitPath([]);
       }
@@ -2,10 +2,9 @@
 import { useEffect, useRef, useState } from "react"
 import * as Cesium from "cesium"
 import "cesium/Build/Cesium/Widgets/widgets.css"
+import { trackRows, type TrackColumns } from "../lib/api"
 const API_BASE = import.meta.env.VITE_API_BASE;
 
-type TrackPoint = { time_utc: string; lat: number; lon: number; alt_km: number }
-
 const SAT_IMAGE: Record<string, string> = {
   iss: "/satellites/iss.png",
   hubble: "/satellites/hubble.png",
@@ -68,7 +67,7 @@ export default function Orbit3D({ satName = "iss" }: { satName?: string }) {
         // --- fetch ground track ---
         const res = await fetch(`${API_BASE}/api/satellite/${satName}/track?minutes=90&step_s=30`)
         if (!res.ok) throw new Error(`track fetch failed: ${res.status}`)
-        const { points } = (await res.json()) as { points: TrackPoint[] }
+        const points = trackRows(((await res.json()) as { points: TrackColumns }).points)
         if (!Array.isArray(points) || points.length === 0) return
 
         // --- draw ground track (projected on Earth) ---
@@ -5,6 +5,31 @@ export interface NowResponse {
   subpoint: { lat: number; lon: number; alt_km: number }
 }
 
+// Track and orbit-path endpoints return one array per field instead of one object per sample
+export interface TrackColumns {
+  time_utc: string[]
+  lat: number[]
+  lon: number[]
+  alt_km: number[]
+}
+
+export interface TrackPoint {
+  time_utc: string
+  lat: number
+  lon: number
+  alt_km: number
+}
+
+export function trackRows(c: TrackColumns): TrackPoint[] {
+  if (!c || !Array.isArray(c.time_utc)) return []
+  return c.time_utc.map((time_utc, i) => ({
+    time_utc,
+    lat: c.lat[i],
+    lon: c.lon[i],
+    alt_km: c.alt_km[i],
+  }))
+}
+
 export async function getPing() {
   const r = await fetch('/api/ping')
   if (!r.ok) throw new Error('ping failed')
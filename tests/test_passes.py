@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from skyfield.api import EarthSatellite
+
+from backend import app
+
+T0_S = 1792000000  # fixed start so the scan is reproducible
+
+TLES = {
+    "iss": (
+        "1 25544U 98067A   26287.50000000  .00016717  00000-0  10270-3 0  9005",
+        "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.50377579 25044",
+    ),
+    "noaa20": (
+        "1 43013U 17073A   26287.50000000  .00000100  00000-0  70000-4 0  9990",
+        "2 43013  98.7400 220.1000 0001200  90.0000 270.1000 14.19550000 45000",
+    ),
+}
+
+SITES = [(-24.0, -27.8), (51.5, -0.1), (0.0, 100.0), (35.7, 139.7), (-60.0, 10.0), (70.0, -150.0)]
+
+
+def _full_grid_passes(sat, lat, lon, hours, step_s, min_elev_deg):
+    """Reference: propagate every step_s sample of the window, no coarse stage."""
+    tvec, iso = app._time_grid(T0_S, hours * 3600 // step_s + 1, step_s)
+    elevs, r_teme = app._topocentric_elevations([sat], tvec, *app._observer_frame(lat, lon))
+    sun_alt = app._sun_altitude_deg(tvec, lat, lon)
+    lit = app._is_sunlit(r_teme, app._sun_direction(tvec))
+    return app._build_passes(iso, elevs[0], elevs[0] >= min_elev_deg, sun_alt, lit[0], step_s, False)
+
+
+def _assert_same_passes(got, want, site):
+    assert [(p["aos_utc"], p["tca_utc"], p["los_utc"]) for p in got.to_list()] == \
+        [(p["aos_utc"], p["tca_utc"], p["los_utc"]) for p in want.to_list()], site
+    np.testing.assert_allclose(got.max_elev_deg, want.max_elev_deg, atol=1e-9)
+
+
+@pytest.fixture(autouse=True)
+def fixed_now(monkeypatch):
+    monkeypatch.setattr(app, "_now_s", lambda: T0_S)
+
+
+@pytest.mark.parametrize("min_elev_deg", [0.0, 10.0, 60.0, 80.0])
+@pytest.mark.parametrize("name", sorted(TLES))
+def test_coarse_to_fine_matches_full_grid(name, min_elev_deg):
+    sat = EarthSatellite(*TLES[name], name, app.ts)
+    for lat, lon in SITES:
+        got = app._passes_for_observer(sat, lat, lon, hours=72, step_s=10, min_elev_deg=min_elev_deg)
+        _assert_same_passes(got, _full_grid_passes(sat, lat, lon, 72, 10, min_elev_deg), (lat, lon))
+
+
+@pytest.mark.parametrize("min_elev_deg", [0.0, 60.0])
+def test_batch_matches_full_grid(min_elev_deg):
+    sats = [EarthSatellite(*TLES[name], name, app.ts) for name in sorted(TLES)]
+    for lat, lon in SITES:
+        batch = app._batch_passes(sats, lat, lon, hours=72, step_s=10, min_elev_deg=min_elev_deg)
+        for sat, got in zip(sats, batch):
+            _assert_same_passes(got, _full_grid_passes(sat, lat, lon, 72, 10, min_elev_deg), (lat, lon))